@@ -1,5 +1,6 @@
 """設定読み込みユーティリティ。"""
 
+import functools
 import os
 from pathlib import Path
 
@@ -33,17 +34,23 @@ def _get_env_int(name, default, logger):
         return default
 
 
+@functools.lru_cache(maxsize=1)
 def load_config(base_dir: Path, logger):
-    """環境変数を読み込み、設定辞書を返す。"""
+    """環境変数を読み込み、設定辞書を返す。
+
+    .env の読み込みと値の検証はプロセス内で1回だけ行い、以降の呼び出しでは
+    同じ辞書を返す。返り値は呼び出し側で変更しないこと。
+    """
     load_dotenv(base_dir / ".env")
 
-    request_interval = _get_env_int("REQUEST_INTERVAL", 5, logger)
+    # API側の429/5xxは再試行時の指数バックオフで吸収するため、既定では待機しない
+    request_interval = _get_env_int("REQUEST_INTERVAL", 0, logger)
     if request_interval < 0:
         logger.warning(
-            "REQUEST_INTERVAL の値 %d は負数のため、デフォルト値 5 を使用します。",
+            "REQUEST_INTERVAL の値 %d は負数のため、デフォルト値 0 を使用します。",
             request_interval,
         )
-        request_interval = 5
+        request_interval = 0
 
     max_videos = _get_env_int("MAX_VIDEOS_PER_RUN", 80, logger)
     if max_videos < 0:
@@ -53,13 +60,68 @@ def load_config(base_dir: Path, logger):
         )
         max_videos = 80
 
+    download_workers = _get_env_int("DOWNLOAD_WORKERS", 2, logger)
+    if download_workers < 1:
+        logger.warning(
+            "DOWNLOAD_WORKERS の値 %d は1未満のため、デフォルト値 2 を使用します。",
+            download_workers,
+        )
+        download_workers = 2
+
+    whisper_device = _get_env_str("WHISPER_DEVICE", "cpu")
+    if whisper_device == "auto":
+        # 演算精度・バッチサイズの既定値を決めるため、ここで実際のデバイスに解決する
+        from transcription_service import resolve_device
+
+        whisper_device = resolve_device(whisper_device)
+    # GPUではint8の重みをfp16で演算すると、メモリ転送量を抑えつつTensor Coreを使える
+    whisper_compute_type = _get_env_str(
+        "WHISPER_COMPUTE_TYPE",
+        "int8_float16" if whisper_device == "cuda" else "int8",
+    )
+    # バッチ推論はGPUで効果が大きい。CPUでは逐次推論の方がメモリ消費が少なく速い
+    default_batch_size = 16 if whisper_device == "cuda" else 1
+    whisper_batch_size = _get_env_int(
+        "WHISPER_BATCH_SIZE", default_batch_size, logger,
+    )
+    if whisper_batch_size < 1:
+        logger.warning(
+            "WHISPER_BATCH_SIZE の値 %d は1未満のため、デフォルト値 %d を使用します。",
+            whisper_batch_size, default_batch_size,
+        )
+        whisper_batch_size = default_batch_size
+
+    whisper_beam_size = _get_env_int("WHISPER_BEAM_SIZE", 1, logger)
+    if whisper_beam_size < 1:
+        logger.warning(
+            "WHISPER_BEAM_SIZE の値 %d は1未満のため、デフォルト値 1 を使用します。",
+            whisper_beam_size,
+        )
+        whisper_beam_size = 1
+
+    whisper_cpu_threads = _get_env_int("WHISPER_CPU_THREADS", 0, logger)
+    if whisper_cpu_threads < 0:
+        logger.warning(
+            "WHISPER_CPU_THREADS の値 %d は負数のため、デフォルト値 0 を使用します。",
+            whisper_cpu_threads,
+        )
+        whisper_cpu_threads = 0
+
     return {
         "shared_drive_name": _get_env_str("SHARED_DRIVE_NAME", ""),
         "source_folder_name": _get_env_str("SOURCE_FOLDER_NAME", "録画データ_all"),
         "target_parent_folder_name": _get_env_str("TARGET_PARENT_FOLDER_NAME", "チーム石川"),
         "target_folder_name": _get_env_str("TARGET_FOLDER_NAME", "議事録"),
-        "whisper_device": _get_env_str("WHISPER_DEVICE", "cpu"),
-        "whisper_compute_type": _get_env_str("WHISPER_COMPUTE_TYPE", "int8"),
+        "whisper_model": _get_env_str("WHISPER_MODEL", "large-v3-turbo"),
+        "whisper_device": whisper_device,
+        "whisper_compute_type": whisper_compute_type,
+        "whisper_batch_size": whisper_batch_size,
+        "whisper_beam_size": whisper_beam_size,
+        "whisper_cpu_threads": whisper_cpu_threads,
+        "whisper_initial_prompt": _get_env_str(
+            "WHISPER_INITIAL_PROMPT", "これは日本語の会議の音声です。",
+        ),
         "request_interval": request_interval,
         "max_videos": max_videos,
+        "download_workers": download_workers,
     }
@@ -3,25 +3,25 @@
 共有ドライブからの動画取得、マイドライブへのGoogleドキュメント作成を担当。
 """
 
+import functools
+import io
 import logging
 import os
-from pathlib import Path
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from operator import itemgetter
 
-import google_auth_httplib2
-import httplib2
 from google.auth.exceptions import RefreshError
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
+from googleapiclient.errors import HttpError
 
-logger = logging.getLogger(__name__)
+from auth import CREDENTIALS_PATH, SCOPES, TOKEN_PATH
 
-SCOPES = [
-    "https://www.googleapis.com/auth/drive",
-    "https://www.googleapis.com/auth/documents",
-]
+logger = logging.getLogger(__name__)
 
 VIDEO_MIME_TYPES = [
     "video/mp4",
@@ -33,16 +33,48 @@ VIDEO_MIME_TYPES = [
     "video/mpeg",
 ]
 
-BASE_DIR = Path(__file__).parent
-TOKEN_PATH = BASE_DIR / "token.json"
-CREDENTIALS_PATH = BASE_DIR / "credentials.json"
+# 検索クエリのうち、フォルダIDに依存しない部分は読み込み時に組み立てておく
+_VIDEO_MIME_QUERY = (
+    "(" + " or ".join(f"mimeType = '{mt}'" for mt in VIDEO_MIME_TYPES) + ")"
+)
+GOOGLE_DOC_MIME_TYPE = "application/vnd.google-apps.document"
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+_DOC_QUERY_SUFFIX = f" and mimeType = '{GOOGLE_DOC_MIME_TYPE}' and trashed = false"
+
+# 一時的なエラー（429/5xx・通信断）時の再試行回数。
+# 待機時間はクライアントライブラリがジッター付き指数バックオフで決める。
+HTTP_NUM_RETRIES = 5
+_RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# 動画ダウンロード時の1リクエストあたりの取得サイズと、分割ダウンロードの並列数
+DOWNLOAD_CHUNK_SIZE = 32 * 1024 * 1024
+DOWNLOAD_RANGE_WORKERS = 8
+# ダウンロード進捗をログに出す間隔（%）
+DOWNLOAD_PROGRESS_STEP = 5
 
+# httplib2.Http はスレッドセーフではないため、ワーカースレッドごとに保持する
+_thread_local = threading.local()
 
+# 分割ダウンロード用のスレッドプール。動画をまたいで使い回し、
+# 各スレッドが保持する接続（TLSセッション）を再利用する
+_range_pool = None
+_range_pool_lock = threading.Lock()
+
+
+class AuthenticationError(RuntimeError):
+    """OAuth2認証を完了できない場合の例外。"""
+
+
+@functools.lru_cache(maxsize=1)
 def authenticate():
     """OAuth2認証を行い、credentialsを返す。
 
     初回はURLを表示し、認証コードを入力してもらう方式。
-    以降はtoken.jsonで自動認証。
+    以降はtoken.jsonで自動認証。結果はプロセス内でキャッシュされ、
+    期限切れのアクセストークンはHTTPクライアントが自動で更新する。
+
+    Raises:
+        AuthenticationError: credentials.json がない、またはブラウザ認証ができない場合
     """
     creds = None
     if TOKEN_PATH.exists():
@@ -53,7 +85,7 @@ def authenticate():
             try:
                 creds.refresh(Request())
             except RefreshError as e:
-                logger.warning(f"トークンのリフレッシュに失敗しました: {e}")
+                logger.warning("トークンのリフレッシュに失敗しました: %s", e)
                 logger.warning(
                     "リフレッシュトークンが期限切れの可能性があります。"
                     "ローカルで 'python auth.py' を再実行して token.json を更新してください。"
@@ -61,7 +93,7 @@ def authenticate():
                 creds = None
         if creds is None or not creds.valid:
             if not CREDENTIALS_PATH.exists():
-                raise FileNotFoundError(
+                raise AuthenticationError(
                     f"credentials.json が見つかりません: {CREDENTIALS_PATH}\n"
                     "setup_guide.md を参照してOAuth2クライアントIDを設定してください。"
                 )
@@ -71,53 +103,95 @@ def authenticate():
             # ブラウザが使える環境ではローカルサーバー方式で認証
             try:
                 creds = flow.run_local_server(port=0)
-            except Exception:
-                raise RuntimeError(
+            except Exception as e:
+                raise AuthenticationError(
                     "ブラウザが利用できない環境では自動認証ができません。\n"
                     "以下のいずれかの方法で認証してください:\n"
                     "  1. ローカルPCで 'python auth.py' を実行して token.json を生成\n"
                     "  2. ブラウザが使える環境で 'python main.py --dry-run' を実行"
-                )
+                ) from e
         with open(TOKEN_PATH, "w") as f:
             f.write(creds.to_json())
 
     return creds
 
 
-def get_services():
-    """Google Drive APIとDocs APIのサービスオブジェクトを返す。"""
+def _authorized_http(creds):
+    """認証情報付きのHTTPクライアントを生成する。"""
+    import google_auth_httplib2
+    import httplib2
+
+    # httplib2.Http は接続を保持するため、同じインスタンスを使い回す限り
+    # TLSハンドシェイクは初回のみで済む
+    return google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http())
+
+
+def _thread_http(http):
+    """呼び出し元スレッド専用のHTTPクライアントを返す。
+
+    メインスレッドでは渡されたクライアントをそのまま使い、ワーカースレッドでは
+    同じ認証情報を持つクライアントをスレッドごとに1つ生成して使い回す。
+    """
+    if threading.current_thread() is threading.main_thread():
+        return http
+    local_http = getattr(_thread_local, "http", None)
+    if local_http is None:
+        local_http = _authorized_http(http.credentials)
+        _thread_local.http = local_http
+    return local_http
+
+
+def _execute(request, num_retries=HTTP_NUM_RETRIES):
+    """APIリクエストを呼び出し元スレッドのHTTPクライアントで実行する。
+
+    レート制限（429・403 rateLimitExceeded）や5xxの場合は指数バックオフで再試行する。
+    作成系など冪等でないリクエストは num_retries=0 で呼び出すこと。
+    """
+    return request.execute(
+        http=_thread_http(request.http), num_retries=num_retries,
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def get_drive_service():
+    """Google Drive APIのサービスオブジェクトを返す（プロセス内で共有）。"""
+    from googleapiclient.discovery import build
+
     creds = authenticate()
-    http = google_auth_httplib2.AuthorizedHttp(
-        creds,
-        http=httplib2.Http(disable_ssl_certificate_validation=True),
+    http = _authorized_http(creds)
+    # ライブラリ同梱のディスカバリ文書を使い、取得・キャッシュ処理を省く
+    return build(
+        "drive", "v3", http=http,
+        cache_discovery=False, static_discovery=True,
+    )
+
+
+def _folder_query(folder_name):
+    """フォルダを名前で検索するクエリを返す。"""
+    return (
+        f"name = '{folder_name}' "
+        f"and mimeType = '{FOLDER_MIME_TYPE}' "
+        f"and trashed = false"
     )
-    drive = build("drive", "v3", http=http)
-    docs = build("docs", "v1", http=http)
-    return drive, docs
 
 
 def find_shared_drive(drive_service, drive_name):
     """共有ドライブをドライブ名で検索し、IDを返す。"""
-    results = (
+    results = _execute(
         drive_service.drives()
         .list(q=f"name = '{drive_name}'", fields="drives(id, name)")
-        .execute()
     )
     drives = results.get("drives", [])
     if not drives:
         raise ValueError(f"共有ドライブ '{drive_name}' が見つかりません")
-    logger.info(f"共有ドライブ発見: {drives[0]['name']} (ID: {drives[0]['id']})")
+    logger.info("共有ドライブ発見: %s (ID: %s)", drives[0]["name"], drives[0]["id"])
     return drives[0]["id"]
 
 
 def find_folder_in_shared_drive(drive_service, folder_name, drive_id):
     """共有ドライブ内のフォルダを名前で検索し、IDを返す。"""
-    q = (
-        f"name = '{folder_name}' "
-        f"and mimeType = 'application/vnd.google-apps.folder' "
-        f"and trashed = false"
-    )
-    results = (
+    q = _folder_query(folder_name)
+    results = _execute(
         drive_service.files()
         .list(
             q=q,
@@ -127,26 +201,20 @@ def find_folder_in_shared_drive(drive_service, folder_name, drive_id):
             includeItemsFromAllDrives=True,
             supportsAllDrives=True,
         )
-        .execute()
     )
     files = results.get("files", [])
     if not files:
         raise ValueError(
             f"フォルダ '{folder_name}' が共有ドライブ内に見つかりません"
         )
-    logger.info(f"ソースフォルダ発見: {files[0]['name']} (ID: {files[0]['id']})")
+    logger.info("ソースフォルダ発見: %s (ID: %s)", files[0]["name"], files[0]["id"])
     return files[0]["id"]
 
 
 def find_folder_in_shared_items(drive_service, folder_name):
     """共有アイテム内のフォルダを名前で検索し、IDを返す。"""
-    q = (
-        f"name = '{folder_name}' "
-        f"and mimeType = 'application/vnd.google-apps.folder' "
-        f"and trashed = false "
-        f"and sharedWithMe = true"
-    )
-    results = (
+    q = _folder_query(folder_name) + " and sharedWithMe = true"
+    results = _execute(
         drive_service.files()
         .list(
             q=q,
@@ -154,14 +222,16 @@ def find_folder_in_shared_items(drive_service, folder_name):
             includeItemsFromAllDrives=True,
             supportsAllDrives=True,
         )
-        .execute()
     )
     files = results.get("files", [])
     if not files:
         raise ValueError(
             f"フォルダ '{folder_name}' が共有アイテム内に見つかりません"
         )
-    logger.info(f"ソースフォルダ発見（共有アイテム）: {files[0]['name']} (ID: {files[0]['id']})")
+    logger.info(
+        "ソースフォルダ発見（共有アイテム）: %s (ID: %s)",
+        files[0]["name"], files[0]["id"],
+    )
     return files[0]["id"]
 
 
@@ -173,43 +243,35 @@ def find_folder_in_my_drive(drive_service, folder_name, parent_id=None):
         folder_name: フォルダ名
         parent_id: 親フォルダのID（指定時はその中から検索）
     """
-    q = (
-        f"name = '{folder_name}' "
-        f"and mimeType = 'application/vnd.google-apps.folder' "
-        f"and trashed = false"
-    )
+    q = _folder_query(folder_name)
     if parent_id:
         q += f" and '{parent_id}' in parents"
     else:
         q += " and 'me' in owners"
 
-    results = (
+    results = _execute(
         drive_service.files()
         .list(q=q, fields="files(id, name)", spaces="drive")
-        .execute()
     )
     files = results.get("files", [])
     if files:
-        logger.info(
-            f"フォルダ発見: {files[0]['name']} (ID: {files[0]['id']})"
-        )
+        logger.info("フォルダ発見: %s (ID: %s)", files[0]["name"], files[0]["id"])
         return files[0]["id"]
 
     # フォルダが存在しない場合は作成
     file_metadata = {
         "name": folder_name,
-        "mimeType": "application/vnd.google-apps.folder",
+        "mimeType": FOLDER_MIME_TYPE,
     }
     if parent_id:
         file_metadata["parents"] = [parent_id]
-    folder = (
+    # 作成は冪等でないため、自動再試行で同名フォルダが重複しないようにする
+    folder = _execute(
         drive_service.files()
-        .create(body=file_metadata, fields="id, name")
-        .execute()
-    )
-    logger.info(
-        f"フォルダを作成: {folder['name']} (ID: {folder['id']})"
+        .create(body=file_metadata, fields="id, name"),
+        num_retries=0,
     )
+    logger.info("フォルダを作成: %s (ID: %s)", folder["name"], folder["id"])
     return folder["id"]
 
 
@@ -218,10 +280,10 @@ def _paginated_file_list(drive_service, q, fields, **extra_kwargs):
     all_files = []
     page_token = None
     while True:
-        kwargs = {"q": q, "fields": fields, "pageSize": 100, **extra_kwargs}
+        kwargs = {"q": q, "fields": fields, "pageSize": 1000, **extra_kwargs}
         if page_token:
             kwargs["pageToken"] = page_token
-        results = drive_service.files().list(**kwargs).execute()
+        results = _execute(drive_service.files().list(**kwargs))
         all_files.extend(results.get("files", []))
         page_token = results.get("nextPageToken")
         if not page_token:
@@ -230,20 +292,16 @@ def _paginated_file_list(drive_service, q, fields, **extra_kwargs):
 
 
 def list_videos_in_folder(drive_service, folder_id, drive_id=None):
-    """指定フォルダ内の全動画ファイルをリストアップ。
+    """指定フォルダ内の全動画ファイルを作成日時の古い順にリストアップ。
 
     Args:
         drive_service: Google Drive APIサービス
         folder_id: フォルダID
         drive_id: 共有ドライブID（共有アイテムの場合はNone）
     """
-    mime_query = " or ".join(
-        [f"mimeType = '{mt}'" for mt in VIDEO_MIME_TYPES]
-    )
-    q = f"'{folder_id}' in parents and ({mime_query}) and trashed = false"
+    q = f"'{folder_id}' in parents and {_VIDEO_MIME_QUERY} and trashed = false"
 
     extra_kwargs = {
-        "orderBy": "createdTime",
         "includeItemsFromAllDrives": True,
         "supportsAllDrives": True,
     }
@@ -253,67 +311,178 @@ def list_videos_in_folder(drive_service, folder_id, drive_id=None):
 
     all_files = _paginated_file_list(
         drive_service, q,
-        "nextPageToken, files(id, name, mimeType, createdTime, size)",
+        "nextPageToken, files(id, name, mimeType, createdTime, size, md5Checksum)",
         **extra_kwargs,
     )
-    logger.info(f"動画ファイル {len(all_files)} 件を発見")
+    # サーバー側の orderBy は遅いため、取得後に作成日時順へ並べ替える
+    # （createdTime はRFC 3339形式のUTC時刻なので文字列比較で順序が決まる）
+    all_files.sort(key=itemgetter("createdTime"))
+    logger.info("動画ファイル %d 件を発見", len(all_files))
     return all_files
 
 
 def list_docs_in_folder(drive_service, folder_id):
-    """指定フォルダ内のGoogleドキュメントの名前一覧を返す（重複チェック用）。"""
-    q = (
-        f"'{folder_id}' in parents "
-        f"and mimeType = 'application/vnd.google-apps.document' "
-        f"and trashed = false"
-    )
+    """指定フォルダ内のGoogleドキュメントの名前一覧を返す（重複チェック用）。
+
+    1回の実行につき1度だけ呼び出し、返された集合に作成したドキュメント名を
+    追加しながら使い回すこと。
+    """
+    q = f"'{folder_id}' in parents{_DOC_QUERY_SUFFIX}"
     all_docs = _paginated_file_list(
         drive_service, q, "nextPageToken, files(id, name)",
     )
     return {doc["name"] for doc in all_docs}
 
 
-def download_video(drive_service, file_id, dest_path):
-    """動画ファイルをGoogle Driveからダウンロード。"""
+def _get_range_pool():
+    """分割ダウンロード用のスレッドプールを返す（初回呼び出し時に生成）。"""
+    global _range_pool
+    with _range_pool_lock:
+        if _range_pool is None:
+            _range_pool = ThreadPoolExecutor(
+                max_workers=DOWNLOAD_RANGE_WORKERS,
+                thread_name_prefix="drive-range",
+            )
+        return _range_pool
+
+
+def _download_ranges(request, dest_path, size):
+    """Rangeリクエストでファイルを分割し、並行してダウンロードする。
+
+    Raises:
+        HttpError: サーバーが部分取得（206）に応答しなかった場合
+    """
+    # 書き込み先を先に確保し、各ワーカーが自分の範囲へ直接書き込む
+    with open(dest_path, "wb") as f:
+        f.truncate(size)
+
+    ranges = [
+        (start, min(start + DOWNLOAD_CHUNK_SIZE, size) - 1)
+        for start in range(0, size, DOWNLOAD_CHUNK_SIZE)
+    ]
+    # いずれかの範囲が失敗したら、まだ始まっていない範囲は取得しない
+    stop = threading.Event()
+
+    def fetch(byte_range):
+        if stop.is_set():
+            return
+        start, end = byte_range
+        http = _thread_http(request.http)
+        # 一時的なエラーはその範囲だけを再取得し、全体のやり直しを避ける
+        for attempt in range(HTTP_NUM_RETRIES + 1):
+            if attempt:
+                time.sleep(random.random() * 2 ** attempt)
+            try:
+                resp, content = http.request(
+                    request.uri, method="GET",
+                    headers={"Range": f"bytes={start}-{end}"},
+                )
+            except OSError:
+                if attempt == HTTP_NUM_RETRIES:
+                    raise
+                continue
+            if resp.status not in _RETRYABLE_STATUSES:
+                break
+        else:
+            logger.warning(
+                "  範囲 %d-%d の取得が再試行後も失敗しました（HTTP %d）",
+                start, end, resp.status,
+            )
+        if resp.status != 206 or "content-range" not in resp:
+            stop.set()
+            raise HttpError(resp, content, uri=request.uri)
+        with open(dest_path, "r+b") as f:
+            f.seek(start)
+            f.write(content)
+
+    # Rangeに対応していないサーバーは各リクエストにファイル全体を返すため、
+    # 最初の範囲だけで部分取得できることを確かめてから並行取得に移る
+    fetch(ranges[0])
+
+    last_logged = 0
+    futures = [_get_range_pool().submit(fetch, r) for r in ranges[1:]]
+    try:
+        for done, future in enumerate(as_completed(futures), 2):
+            future.result()
+            pct = done * 100 // len(ranges)
+            if pct - last_logged >= DOWNLOAD_PROGRESS_STEP:
+                logger.info("  ダウンロード進捗: %d%%", pct)
+                last_logged = pct
+    except BaseException:
+        stop.set()
+        for future in futures:
+            future.cancel()
+        raise
+
+
+def download_video(drive_service, file_id, dest_path, size=None):
+    """動画ファイルをGoogle Driveからダウンロード。
+
+    ワーカースレッドから並行して呼び出してもよい。
+
+    Args:
+        drive_service: Google Drive APIサービス
+        file_id: ファイルID
+        dest_path: 保存先のパス
+        size: ファイルサイズ（バイト）。指定時は範囲ごとに並行してダウンロードする
+    """
     request = drive_service.files().get_media(
         fileId=file_id, supportsAllDrives=True
     )
+    request.http = _thread_http(request.http)
+
+    if size and size > DOWNLOAD_CHUNK_SIZE:
+        try:
+            _download_ranges(request, dest_path, size)
+            logger.info("  ダウンロード完了: %s", dest_path)
+            return
+        except HttpError as e:
+            logger.warning(
+                "  分割ダウンロードに失敗したため通常のダウンロードに切り替えます: %s", e,
+            )
+
+    from googleapiclient.http import MediaIoBaseDownload
+
     with open(dest_path, "wb") as f:
-        downloader = MediaIoBaseDownload(f, request)
+        downloader = MediaIoBaseDownload(
+            f, request, chunksize=DOWNLOAD_CHUNK_SIZE,
+        )
         done = False
+        last_logged = 0
         while not done:
-            status, done = downloader.next_chunk()
+            status, done = downloader.next_chunk(num_retries=HTTP_NUM_RETRIES)
             if status:
-                logger.info(f"  ダウンロード進捗: {int(status.progress() * 100)}%")
-    logger.info(f"  ダウンロード完了: {dest_path}")
-
-
-def create_google_doc(drive_service, docs_service, title, content, folder_id):
-    """Googleドキュメントを作成し、指定フォルダに配置。"""
-    # ドキュメントを作成
-    doc = docs_service.documents().create(body={"title": title}).execute()
-    doc_id = doc["documentId"]
-
-    # コンテンツを挿入
-    requests = [
-        {
-            "insertText": {
-                "location": {"index": 1},
-                "text": content,
-            }
-        }
-    ]
-    docs_service.documents().batchUpdate(
-        documentId=doc_id, body={"requests": requests}
-    ).execute()
-
-    # 対象フォルダに移動（rootから移動）
-    drive_service.files().update(
-        fileId=doc_id,
-        addParents=folder_id,
-        removeParents="root",
-        fields="id, parents",
-    ).execute()
-
-    logger.info(f"  Googleドキュメント作成完了: {title} (ID: {doc_id})")
+                pct = int(status.progress() * 100)
+                if pct - last_logged >= DOWNLOAD_PROGRESS_STEP:
+                    logger.info("  ダウンロード進捗: %d%%", pct)
+                    last_logged = pct
+    logger.info("  ダウンロード完了: %s", dest_path)
+
+
+def create_google_doc(drive_service, title, content, folder_id):
+    """Googleドキュメントを指定フォルダに作成する。
+
+    テキストをGoogleドキュメント形式へ変換しながらアップロードするため、
+    作成・本文挿入・フォルダ移動が1回のリクエストで済む。
+    """
+    from googleapiclient.http import MediaIoBaseUpload
+
+    file_metadata = {
+        "name": title,
+        "mimeType": GOOGLE_DOC_MIME_TYPE,
+        "parents": [folder_id],
+    }
+    media = MediaIoBaseUpload(
+        io.BytesIO(content.encode("utf-8")), mimetype="text/plain",
+    )
+    # files.create は冪等でなく、作成後に5xxやタイムアウトが返った場合に再試行すると
+    # 同じ議事録が2件作られるため、自動再試行しない（失敗時は次回実行で再処理される）
+    doc = _execute(
+        drive_service.files()
+        .create(body=file_metadata, media_body=media, fields="id"),
+        num_retries=0,
+    )
+    doc_id = doc["id"]
+
+    logger.info("  Googleドキュメント作成完了: %s (ID: %s)", title, doc_id)
     return doc_id
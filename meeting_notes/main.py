@@ -2,31 +2,47 @@
 """会議動画 → 議事録 自動生成スクリプト
 
 Google Driveの共有アイテム「録画データ_all」フォルダから動画を取得し、
-Whisper (large-v3) で日本語書き起こしを行い、
+Whisperで日本語書き起こしを行い、
 マイドライブの「チーム石川/議事録」フォルダにGoogleドキュメントとして保存する。
 
 使い方:
     python main.py          # 通常実行
     python main.py --dry-run  # 実行せずに対象動画を確認
+    python main.py --serve    # 常駐して定期的に実行（モデルを再ロードしない）
 """
 
 import argparse
+import functools
 import json
 import logging
 import os
 import shutil
 import subprocess
 import tempfile
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import closing
 from datetime import datetime
 from pathlib import Path
 
+from google.auth.exceptions import RefreshError
+
+try:
+    import orjson
+except ImportError:  # 未インストール時は標準のjsonで読み書きする
+    orjson = None
+
 import drive_service as ds
 import transcription_service as ts
 from config import load_config
+from transcript_cache import TranscriptCache
 
 BASE_DIR = Path(__file__).parent
 PROCESSED_LOG = BASE_DIR / "processed_videos.json"
+PROCESSED_JOURNAL = BASE_DIR / "processed_videos.jsonl"
+TRANSCRIPT_CACHE_PATH = BASE_DIR / "transcript_cache.sqlite3"
 MB = 1024 * 1024
 
 logging.basicConfig(
@@ -42,26 +58,77 @@ logger = logging.getLogger(__name__)
 
 # ── 処理済み管理 ──────────────────────────────────────────
 
-def load_processed() -> dict:
-    """処理済み動画IDの記録を読み込む。"""
+def _json_dumps(obj, indent: bool = False) -> bytes:
+    """JSONをUTF-8のバイト列に変換する（orjsonがあれば使う）。"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(
+        obj, ensure_ascii=False, indent=2 if indent else None,
+    ).encode("utf-8")
+
+
+def _json_loads(data: bytes):
+    """JSONを読み込む（orjsonがあれば使う）。"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _load_snapshot() -> dict:
+    """処理済み動画IDの記録（スナップショット）を読み込む。"""
     if not PROCESSED_LOG.exists():
         return {}
     try:
-        with open(PROCESSED_LOG, encoding="utf-8") as f:
-            data = json.load(f)
-            if isinstance(data, dict):
-                return data
-            logger.warning("processed_videos.json の形式が不正なため初期化します")
-            return {}
-    except json.JSONDecodeError:
+        data = _json_loads(PROCESSED_LOG.read_bytes())
+        if isinstance(data, dict):
+            return data
+        logger.warning("processed_videos.json の形式が不正なため初期化します")
+        return {}
+    except (json.JSONDecodeError, UnicodeDecodeError):
         logger.warning("processed_videos.json のJSONが壊れているため初期化します")
         return {}
 
 
+def load_processed() -> dict:
+    """処理済み動画IDの記録を読み込む。
+
+    スナップショットを読み込んだ後、追記ジャーナルの内容を順に反映する。
+    """
+    processed = _load_snapshot()
+    if not PROCESSED_JOURNAL.exists():
+        return processed
+    with open(PROCESSED_JOURNAL, "rb") as f:
+        for line in f:
+            try:
+                event = _json_loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                # 書き込み途中で中断された行は読み飛ばす
+                logger.warning("processed_videos.jsonl の壊れた行を読み飛ばします")
+                continue
+            video_id = event.pop("video_id", None) if isinstance(event, dict) else None
+            if video_id is None:
+                logger.warning("processed_videos.jsonl の video_id がない行を読み飛ばします")
+                continue
+            processed[video_id] = event
+    return processed
+
+
+def record_processed(processed: dict, video_id: str, entry: dict) -> None:
+    """1件の処理結果を記録し、ジャーナルに1行追記する。
+
+    ファイル全体を書き直さないため、件数が増えても1件あたりの書き込み量は一定。
+    """
+    processed[video_id] = entry
+    with open(PROCESSED_JOURNAL, "ab") as f:
+        f.write(_json_dumps({"video_id": video_id, **entry}) + b"\n")
+
+
 def save_processed(processed: dict) -> None:
-    """処理済み動画IDの記録を保存する。"""
-    with open(PROCESSED_LOG, "w", encoding="utf-8") as f:
-        json.dump(processed, f, indent=2, ensure_ascii=False)
+    """処理済み動画IDの記録をスナップショットとして保存し、ジャーナルを空にする。"""
+    tmp_path = PROCESSED_LOG.with_suffix(".json.tmp")
+    tmp_path.write_bytes(_json_dumps(processed, indent=True))
+    os.replace(tmp_path, PROCESSED_LOG)
+    PROCESSED_JOURNAL.unlink(missing_ok=True)
 
 
 # ── ユーティリティ ────────────────────────────────────────
@@ -72,36 +139,43 @@ def make_doc_title(video_name: str) -> str:
     return f"【議事録】{stem}"
 
 
-def convert_to_mp3(video_path: str) -> str | None:
-    """MP4をMP3に変換して書き起こし処理を軽量化する。
+def extract_audio(video_path: str):
+    """動画から音声を16kHzモノラルのPCMとして抽出し、Whisperに渡せる配列で返す。
+
+    ffmpegの出力を標準出力から直接受け取るため、中間の音声ファイルを作らず、
+    Whisper側での音声デコードも不要になる。
 
     Returns:
-        MP3ファイルのパス。変換失敗時はNoneを返す。
+        float32の波形配列。変換失敗時はNoneを返す。
     """
-    mp3_path = video_path.rsplit(".", 1)[0] + ".mp3"
     try:
-        subprocess.run(
-            ["ffmpeg", "-i", video_path, "-vn", "-acodec", "libmp3lame",
-             "-ab", "128k", "-y", mp3_path],
+        result = subprocess.run(
+            ["ffmpeg", "-nostdin", "-loglevel", "error", "-nostats",
+             "-threads", "0", "-i", video_path, "-vn",
+             "-ac", "1", "-ar", str(ts.SAMPLE_RATE), "-f", "s16le", "pipe:1"],
             check=True,
-            capture_output=True,
-            text=True,
+            stdout=subprocess.PIPE,
+            # エラー時のメッセージだけを受け取る（進捗表示は出させない）
+            stderr=subprocess.PIPE,
         )
-        video_size = os.path.getsize(video_path) / MB
-        mp3_size = os.path.getsize(mp3_path) / MB
-        ratio = (mp3_size / video_size * 100) if video_size > 0 else 0
-        logger.info(
-            "  MP3変換完了: %.1fMB → %.1fMB (%.0f%%に削減)",
-            video_size, mp3_size, ratio,
-        )
-        return mp3_path
     except FileNotFoundError:
-        logger.warning("  ffmpegが見つかりません。MP4のまま処理します。")
+        logger.warning("  ffmpegが見つかりません。動画のまま処理します。")
         return None
     except subprocess.CalledProcessError as e:
-        logger.warning("  MP3変換に失敗: %s", e.stderr)
+        logger.warning(
+            "  音声抽出に失敗: %s", e.stderr.decode("utf-8", "replace"),
+        )
         return None
 
+    audio = ts.pcm16_to_float32(result.stdout)
+    logger.info(
+        "  音声抽出完了: %.1fMB → %.1fMB (%.0f秒)",
+        os.path.getsize(video_path) / MB,
+        len(result.stdout) / MB,
+        len(audio) / ts.SAMPLE_RATE,
+    )
+    return audio
+
 
 # ── フォルダ検索 ──────────────────────────────────────────
 
@@ -126,8 +200,55 @@ def _find_source_folder(drive_svc, shared_drive_name: str, source_folder_name: s
     return source_folder_id, None
 
 
+def _list_source_videos(drive_svc, config: dict) -> list:
+    """ソースフォルダを特定し、その中の動画ファイル一覧を返す。"""
+    source_folder_id, shared_drive_id = _find_source_folder(
+        drive_svc, config["shared_drive_name"], config["source_folder_name"],
+    )
+    logger.info("動画ファイルを検索中...")
+    return ds.list_videos_in_folder(
+        drive_svc, source_folder_id, drive_id=shared_drive_id,
+    )
+
+
+def _find_target_folder(drive_svc, config: dict):
+    """出力フォルダを特定し、(folder_id, 既存ドキュメント名の集合) を返す。"""
+    logger.info(
+        "出力フォルダ '%s/%s' を検索中...",
+        config["target_parent_folder_name"],
+        config["target_folder_name"],
+    )
+    parent_folder_id = ds.find_folder_in_my_drive(
+        drive_svc, config["target_parent_folder_name"],
+    )
+    target_folder_id = ds.find_folder_in_my_drive(
+        drive_svc, config["target_folder_name"], parent_id=parent_folder_id,
+    )
+    existing_docs = ds.list_docs_in_folder(drive_svc, target_folder_id)
+    return target_folder_id, existing_docs
+
+
 # ── フィルタリング ────────────────────────────────────────
 
+def _mark_already_exists(video, doc_title: str, processed: dict) -> None:
+    """同名のドキュメントが既に存在する動画を処理済みとして記録する。"""
+    logger.info("スキップ（ドキュメント存在）: %s", video["name"])
+    record_processed(processed, video["id"], {
+        "name": video["name"],
+        "doc_title": doc_title,
+        "processed_at": datetime.now().isoformat(),
+        "status": "already_exists",
+    })
+
+
+def _add_derived_fields(video: dict) -> dict:
+    """処理中に繰り返し使うサイズ・拡張子を動画情報に一度だけ計算して持たせる。"""
+    video["size"] = int(video.get("size", 0))
+    video["size_mb"] = video["size"] / MB
+    video["suffix"] = Path(video["name"]).suffix or ".mp4"
+    return video
+
+
 def _filter_unprocessed(videos: list, processed: dict, existing_docs: set) -> list:
     """未処理の動画をフィルタリングして返す。"""
     unprocessed = []
@@ -139,113 +260,209 @@ def _filter_unprocessed(videos: list, processed: dict, existing_docs: set) -> li
             # エラーだった動画は再処理対象に含める
             if entry.get("status", "").startswith("error"):
                 logger.info("再処理（前回エラー）: %s", video["name"])
-                unprocessed.append(video)
+                unprocessed.append(_add_derived_fields(video))
                 continue
             logger.info("スキップ（処理済み）: %s", video["name"])
             continue
 
         if doc_title in existing_docs:
-            logger.info("スキップ（ドキュメント存在）: %s", video["name"])
-            processed[video["id"]] = {
-                "name": video["name"],
-                "doc_title": doc_title,
-                "processed_at": datetime.now().isoformat(),
-                "status": "already_exists",
-            }
+            _mark_already_exists(video, doc_title, processed)
             continue
 
-        unprocessed.append(video)
+        unprocessed.append(_add_derived_fields(video))
     return unprocessed
 
 
 # ── 動画処理 ──────────────────────────────────────────────
 
-def _process_video(video, drive_svc, docs_svc, target_folder_id,
-                   transcriber, has_ffmpeg, processed):
-    """1件の動画を処理する（ダウンロード→変換→書き起こし→保存）。
+class _Throttle:
+    """呼び出しの開始間隔が min_interval 秒以上空くように待機させる（スレッドセーフ）。"""
+
+    def __init__(self, min_interval: float):
+        self._min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_time - now
+            self._next_time = max(now, self._next_time) + self._min_interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _prepare_media(drive_svc, video, tmp_path: str, has_ffmpeg: bool,
+                   throttle: _Throttle):
+    """動画をダウンロードし、書き起こしに渡す音声を返す。
+
+    ワーカースレッド上で実行される。
+
+    Returns:
+        (抽出した音声の波形配列, 発話区間)。
+        ffmpegが使えない場合は (動画ファイルのパス, None)。
+    """
+    throttle.wait()
+    ds.download_video(
+        drive_svc, video["id"], tmp_path, size=video["size"],
+    )
+    if not has_ffmpeg:
+        return tmp_path, None
+
+    # 音声のみを抽出（ffmpegが利用可能な場合）
+    logger.info("  音声を抽出中: %s", video["name"])
+    audio = extract_audio(tmp_path)
+    if audio is None:
+        return tmp_path, None
+    # 動画の一時ファイルを先に削除（ディスク節約）
+    try:
+        os.unlink(tmp_path)
+    except OSError:
+        pass
+    # 発話区間の検出もGPUを使わないため、書き起こし待ちの間に済ませておく
+    clips = ts.detect_speech(audio)
+    return audio, clips
+
+
+def _start_prepare(executor, drive_svc, video, has_ffmpeg: bool,
+                   transcript_cache, throttle: _Throttle):
+    """動画のダウンロードと音声抽出をワーカースレッドで開始する。
+
+    Returns:
+        (一時ファイルのパス, 書き起こし対象の音声と発話区間を返すFuture)。
+        書き起こし結果がキャッシュ済みでダウンロード不要な場合はNone。
+    """
+    if transcript_cache.get(video.get("md5Checksum")) is not None:
+        return None
+    with tempfile.NamedTemporaryFile(suffix=video["suffix"], delete=False) as tmp:
+        tmp_path = tmp.name
+    logger.info("ダウンロード開始: %s", video["name"])
+    future = executor.submit(
+        _prepare_media, drive_svc, video, tmp_path, has_ffmpeg, throttle,
+    )
+    return tmp_path, future
+
+
+def _remove_tmp_file(tmp_path: str) -> None:
+    """動画の一時ファイルを削除する。"""
+    try:
+        os.unlink(tmp_path)
+    except OSError:
+        pass
+
+
+def _discard_prepared(prepared) -> None:
+    """未使用の先読み処理を中止し、一時ファイルを削除する。"""
+    prepared = [p for p in prepared if p is not None]
+    for _, future in prepared:
+        future.cancel()
+    # 実行中の処理は完了を待ってから削除する
+    wait([future for _, future in prepared])
+    for tmp_path, _ in prepared:
+        _remove_tmp_file(tmp_path)
+
+
+def _process_video(video, prepared, drive_svc, target_folder_id,
+                   transcriber, processed, existing_docs, transcript_cache):
+    """1件の動画を処理する（準備完了待ち→書き起こし→保存）。
+
+    Args:
+        prepared: _start_prepare() の戻り値
+        existing_docs: 出力フォルダ内のドキュメント名の集合（作成に成功したら追加する）
+        transcript_cache: 書き起こし結果のキャッシュ
 
     Returns:
         True: 成功, False: エラー
+
+    Raises:
+        RefreshError: 認証情報が失効している場合（動画ごとのエラーとして扱わない）
     """
     video_name = video["name"]
     video_id = video["id"]
-    tmp_path = None
-    mp3_path = None
+    md5 = video.get("md5Checksum")
 
     try:
-        # 一時ファイルに動画をダウンロード
-        suffix = Path(video_name).suffix or ".mp4"
-        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
-            tmp_path = tmp.name
-
-        logger.info("  ダウンロード中: %s", video_name)
-        ds.download_video(drive_svc, video_id, tmp_path)
-
-        # MP3に変換（ffmpegが利用可能な場合）
-        media_path = tmp_path
-        if has_ffmpeg:
-            logger.info("  MP3に変換中...")
-            mp3_path = convert_to_mp3(tmp_path)
-            if mp3_path:
-                media_path = mp3_path
-                # MP4の一時ファイルを先に削除（ディスク節約）
-                try:
-                    os.unlink(tmp_path)
-                    tmp_path = None
-                except OSError:
-                    pass
-
-        # Whisperで日本語書き起こしを実行
-        logger.info("  Whisper (large-v3) で日本語書き起こしを実行中...")
-        t0 = time.perf_counter()
-        segments = transcriber.transcribe(media_path)
-        logger.info("  書き起こし完了（%.1f秒）", time.perf_counter() - t0)
+        transcript = transcript_cache.get(md5)
+        if transcript is not None:
+            logger.info("  同じ内容の動画の書き起こし結果を再利用します")
+            if prepared is not None:
+                _discard_prepared([prepared])
+        else:
+            _, future = prepared
+            logger.info("  ダウンロード・変換の完了を待機中: %s", video_name)
+            audio, clips = future.result()
+
+            # Whisperで日本語書き起こしを実行
+            logger.info(
+                "  Whisper (%s) で日本語書き起こしを実行中...", transcriber.model_size,
+            )
+            t0 = time.perf_counter()
+            segments = transcriber.transcribe(audio, clip_timestamps=clips)
+            # デコードはセグメントを読み出しながら進むため、整形までを計測する
+            transcript = ts.render_transcript(segments)
+            logger.info("  書き起こし完了（%.1f秒）", time.perf_counter() - t0)
+            transcript_cache.put(md5, transcript)
 
         # 議事録テキストを生成
-        notes = ts.render_meeting_notes(video_name, segments)
+        notes = ts.render_meeting_notes(video_name, transcript)
 
         # Googleドキュメントとして保存
         doc_title = make_doc_title(video_name)
         logger.info("  Googleドキュメントを作成中: %s", doc_title)
         t1 = time.perf_counter()
         doc_id = ds.create_google_doc(
-            drive_svc, docs_svc, doc_title, notes, target_folder_id,
+            drive_svc, doc_title, notes, target_folder_id,
         )
+        existing_docs.add(doc_title)
         logger.info("  Googleドキュメント保存完了（%.1f秒）", time.perf_counter() - t1)
 
         # 処理済みとして記録
-        processed[video_id] = {
+        record_processed(processed, video_id, {
             "name": video_name,
             "doc_title": doc_title,
             "doc_id": doc_id,
             "processed_at": datetime.now().isoformat(),
             "status": "success",
-        }
-        save_processed(processed)
+        })
         logger.info("  完了: %s", doc_title)
         return True
 
+    except RefreshError:
+        # 認証エラーは後続の動画でも必ず失敗するため、ここで実行全体を中断する
+        raise
+
     except Exception as e:
         logger.error("  エラー: %s の処理に失敗しました: %s", video_name, e)
-        processed[video_id] = {
+        record_processed(processed, video_id, {
             "name": video_name,
             "processed_at": datetime.now().isoformat(),
             "status": f"error: {e}",
-        }
-        save_processed(processed)
+        })
         return False
 
     finally:
-        for path in [tmp_path, mp3_path]:
-            if path:
-                try:
-                    os.unlink(path)
-                except OSError:
-                    pass
+        if prepared is not None:
+            _remove_tmp_file(prepared[0])
 
 
 # ── メイン処理 ────────────────────────────────────────────
 
+@functools.lru_cache(maxsize=1)
+def _load_transcriber(model_size: str, compute_type: str, device: str,
+                      batch_size: int, beam_size: int, cpu_threads: int,
+                      initial_prompt: str):
+    """Whisperモデルをロードする。同じプロセス内では1回だけロードする。"""
+    return ts.JapaneseTranscriber(
+        model_size=model_size,
+        compute_type=compute_type,
+        device=device,
+        batch_size=batch_size,
+        beam_size=beam_size,
+        cpu_threads=cpu_threads,
+        initial_prompt=initial_prompt,
+    )
+
+
 def run(dry_run: bool = False) -> None:
     """メイン処理を実行する。"""
     config = load_config(BASE_DIR, logger)
@@ -253,42 +470,26 @@ def run(dry_run: bool = False) -> None:
     # ffmpegの有無を確認
     has_ffmpeg = shutil.which("ffmpeg") is not None
     if has_ffmpeg:
-        logger.info("ffmpeg検出: MP4→MP3変換で書き起こし処理を軽量化します")
+        logger.info("ffmpeg検出: 音声のみ（16kHzモノラル）を抽出して書き起こし処理を軽量化します")
     else:
-        logger.warning("ffmpegが見つかりません。MP4のまま処理します。")
+        logger.warning("ffmpegが見つかりません。動画のまま処理します。")
 
     logger.info("Google Drive APIに接続中...")
-    drive_svc, docs_svc = ds.get_services()
+    drive_svc = ds.get_drive_service()
 
-    # ソースフォルダ・出力フォルダを特定
-    source_folder_id, shared_drive_id = _find_source_folder(
-        drive_svc, config["shared_drive_name"], config["source_folder_name"],
-    )
-
-    logger.info(
-        "出力フォルダ '%s/%s' を検索中...",
-        config["target_parent_folder_name"],
-        config["target_folder_name"],
-    )
-    parent_folder_id = ds.find_folder_in_my_drive(
-        drive_svc, config["target_parent_folder_name"],
-    )
-    target_folder_id = ds.find_folder_in_my_drive(
-        drive_svc, config["target_folder_name"], parent_id=parent_folder_id,
-    )
+    # 動画一覧（ソース側）と既存ドキュメント一覧（出力側）は互いに独立しているため並行して取得する
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        videos_future = executor.submit(_list_source_videos, drive_svc, config)
+        target_future = executor.submit(_find_target_folder, drive_svc, config)
+        videos = videos_future.result()
+        target_folder_id, existing_docs = target_future.result()
 
-    # 動画ファイルの一覧を取得
-    logger.info("動画ファイルを検索中...")
-    videos = ds.list_videos_in_folder(
-        drive_svc, source_folder_id, drive_id=shared_drive_id,
-    )
     if not videos:
         logger.info("処理対象の動画ファイルが見つかりませんでした。")
         return
 
     # 未処理の動画をフィルタリング
     processed = load_processed()
-    existing_docs = ds.list_docs_in_folder(drive_svc, target_folder_id)
     unprocessed = _filter_unprocessed(videos, processed, existing_docs)
     save_processed(processed)
 
@@ -310,14 +511,18 @@ def run(dry_run: bool = False) -> None:
     if dry_run:
         logger.info("=== ドライラン: 以下の動画が処理対象です ===")
         for video in unprocessed:
-            size_mb = int(video.get("size", 0)) / MB
-            logger.info("  - %s (%.1f MB)", video["name"], size_mb)
+            logger.info("  - %s (%.1f MB)", video["name"], video["size_mb"])
         return
 
-    # Whisperモデルをロード
-    transcriber = ts.JapaneseTranscriber(
-        compute_type=config["whisper_compute_type"],
-        device=config["whisper_device"],
+    # Whisperモデルをロード（常駐モードでは2回目以降ロード済みのものを使う）
+    transcriber = _load_transcriber(
+        config["whisper_model"],
+        config["whisper_compute_type"],
+        config["whisper_device"],
+        config["whisper_batch_size"],
+        config["whisper_beam_size"],
+        config["whisper_cpu_threads"],
+        config["whisper_initial_prompt"],
     )
 
     # 各動画を処理
@@ -325,36 +530,67 @@ def run(dry_run: bool = False) -> None:
     error_count = 0
     consecutive_errors = 0
     max_consecutive_errors = 3
-    request_interval = config["request_interval"]
-
-    for i, video in enumerate(unprocessed, 1):
-        size_mb = int(video.get("size", 0)) / MB
-        logger.info(
-            "\n%s\n[%d/%d] 処理中: %s (%.1f MB)",
-            "=" * 60, i, len(unprocessed), video["name"], size_mb,
-        )
-
-        ok = _process_video(
-            video, drive_svc, docs_svc, target_folder_id,
-            transcriber, has_ffmpeg, processed,
+    # ダウンロード開始の間隔を空けてDrive APIの負荷を抑える（書き起こしは待たせない）
+    throttle = _Throttle(config["request_interval"])
+
+    # 書き起こし中に後続の動画のダウンロードと音声抽出を先に進めておく
+    prefetch = config["download_workers"]
+    # モデルやデコード設定が変わった場合は、以前の書き起こし結果を再利用しない
+    transcript_cache = TranscriptCache(
+        TRANSCRIPT_CACHE_PATH, transcriber.cache_params,
+    )
+    with closing(transcript_cache), \
+            ThreadPoolExecutor(max_workers=prefetch) as executor:
+        pending = deque(
+            _start_prepare(
+                executor, drive_svc, video, has_ffmpeg, transcript_cache,
+                throttle,
+            )
+            for video in unprocessed[:prefetch]
         )
-        if ok:
-            success_count += 1
-            consecutive_errors = 0
-        else:
-            error_count += 1
-            consecutive_errors += 1
-            if consecutive_errors >= max_consecutive_errors:
-                logger.error(
-                    "%d 件連続でエラーが発生したため処理を中断します。",
-                    max_consecutive_errors,
+        try:
+            for i, video in enumerate(unprocessed, 1):
+                logger.info(
+                    "\n%s\n[%d/%d] 処理中: %s (%.1f MB)",
+                    "=" * 60, i, len(unprocessed), video["name"],
+                    video["size_mb"],
                 )
-                break
 
-        # 次の処理まで待機（レート制限対策）
-        if i < len(unprocessed) and request_interval > 0:
-            logger.info("  次の処理まで %d 秒待機...", request_interval)
-            time.sleep(request_interval)
+                prepared = pending.popleft()
+                next_index = i - 1 + prefetch
+                if next_index < len(unprocessed):
+                    pending.append(_start_prepare(
+                        executor, drive_svc, unprocessed[next_index],
+                        has_ffmpeg, transcript_cache, throttle,
+                    ))
+
+                # 同じ実行内で同名のドキュメントを作成済みならスキップする
+                doc_title = make_doc_title(video["name"])
+                if doc_title in existing_docs:
+                    _discard_prepared([prepared])
+                    _mark_already_exists(video, doc_title, processed)
+                    continue
+
+                ok = _process_video(
+                    video, prepared, drive_svc, target_folder_id,
+                    transcriber, processed, existing_docs, transcript_cache,
+                )
+                if ok:
+                    success_count += 1
+                    consecutive_errors = 0
+                else:
+                    error_count += 1
+                    consecutive_errors += 1
+                    if consecutive_errors >= max_consecutive_errors:
+                        logger.error(
+                            "%d 件連続でエラーが発生したため処理を中断します。",
+                            max_consecutive_errors,
+                        )
+                        break
+        finally:
+            _discard_prepared(pending)
+            # ジャーナルをスナップショットにまとめる
+            save_processed(processed)
 
     logger.info(
         "\n%s\n処理完了: 成功 %d 件, エラー %d 件",
@@ -362,6 +598,24 @@ def run(dry_run: bool = False) -> None:
     )
 
 
+def serve(poll_interval: int) -> None:
+    """常駐モード: poll_interval 秒ごとに run() を繰り返す。
+
+    Whisperモデル・Drive APIクライアントはプロセス内で保持されるため、
+    cron で毎回起動する場合と違ってモデルのロード時間は初回のみかかる。
+    """
+    logger.info("常駐モードで起動します（実行間隔: %d 秒）", poll_interval)
+    while True:
+        try:
+            run()
+        except (ds.AuthenticationError, RefreshError):
+            raise
+        except Exception:
+            logger.exception("実行中にエラーが発生しました。次回の実行で再試行します")
+        logger.info("%d 秒後に再実行します", poll_interval)
+        time.sleep(poll_interval)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="会議動画から議事録を自動生成",
@@ -371,8 +625,26 @@ def main():
         action="store_true",
         help="実行せずに処理対象の動画を確認する",
     )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="常駐して一定間隔で処理を繰り返す",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=int,
+        default=600,
+        help="--serve 時の実行間隔（秒）",
+    )
     args = parser.parse_args()
-    run(dry_run=args.dry_run)
+    try:
+        if args.serve:
+            serve(args.poll_interval)
+        else:
+            run(dry_run=args.dry_run)
+    except (ds.AuthenticationError, RefreshError) as e:
+        logger.error("Googleの認証に失敗したため処理を中断します: %s", e)
+        raise SystemExit(1)
 
 
 if __name__ == "__main__":
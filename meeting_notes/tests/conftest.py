@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# meeting_notes 直下のモジュールを `import main` のように読み込めるようにする
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,116 @@
+import pytest
+
+pytest.importorskip("googleapiclient")
+pytest.importorskip("numpy")
+
+import main  # noqa: E402
+from transcript_cache import TranscriptCache  # noqa: E402
+
+
+@pytest.fixture
+def processed_files(tmp_path, monkeypatch):
+    """処理済み記録の保存先を一時ディレクトリに差し替える。"""
+    monkeypatch.setattr(main, "PROCESSED_LOG", tmp_path / "processed_videos.json")
+    monkeypatch.setattr(main, "PROCESSED_JOURNAL", tmp_path / "processed_videos.jsonl")
+    return tmp_path
+
+
+class _NoSubmitExecutor:
+    def submit(self, *args, **kwargs):
+        raise AssertionError("キャッシュ済みの動画はダウンロードしない")
+
+
+class _FailingTranscriber:
+    model_size = "large-v3-turbo"
+
+    def transcribe(self, *args, **kwargs):
+        raise AssertionError("キャッシュ済みの動画は書き起こさない")
+
+
+def _video(md5="md5-1"):
+    return main._add_derived_fields({
+        "id": "video-1",
+        "name": "定例会議.mp4",
+        "size": "1048576",
+        "md5Checksum": md5,
+    })
+
+
+def test_start_prepare_skips_download_on_cache_hit(tmp_path):
+    cache = TranscriptCache(tmp_path / "cache.sqlite3", "params")
+    cache.put("md5-1", "- 前回の書き起こし")
+
+    prepared = main._start_prepare(
+        _NoSubmitExecutor(), None, _video(), True, cache, main._Throttle(0),
+    )
+
+    assert prepared is None
+    cache.close()
+
+
+def test_process_video_reuses_cached_transcript(tmp_path, monkeypatch,
+                                                processed_files):
+    cache = TranscriptCache(tmp_path / "cache.sqlite3", "params")
+    cache.put("md5-1", "- 前回の書き起こし")
+    created = []
+    monkeypatch.setattr(
+        main.ds, "create_google_doc",
+        lambda svc, title, content, folder_id: created.append(content) or "doc-1",
+    )
+    processed = {}
+    existing_docs = set()
+
+    ok = main._process_video(
+        _video(), None, None, "folder-1", _FailingTranscriber(),
+        processed, existing_docs, cache,
+    )
+
+    assert ok is True
+    assert len(created) == 1
+    assert "- 前回の書き起こし" in created[0]
+    assert processed["video-1"]["status"] == "success"
+    assert main.make_doc_title("定例会議.mp4") in existing_docs
+    cache.close()
+
+
+def test_journal_is_replayed_over_snapshot(processed_files):
+    main.PROCESSED_LOG.write_text(
+        '{"video-1": {"name": "a.mp4", "status": "error: timeout"}}',
+        encoding="utf-8",
+    )
+    main.record_processed({}, "video-1", {"name": "a.mp4", "status": "success"})
+    main.record_processed({}, "video-2", {"name": "b.mp4", "status": "success"})
+
+    processed = main.load_processed()
+
+    assert processed == {
+        "video-1": {"name": "a.mp4", "status": "success"},
+        "video-2": {"name": "b.mp4", "status": "success"},
+    }
+
+
+def test_torn_and_malformed_journal_lines_are_skipped(processed_files):
+    main.record_processed({}, "video-1", {"name": "会議.mp4", "status": "success"})
+    with open(main.PROCESSED_JOURNAL, "a", encoding="utf-8") as f:
+        f.write('{"name": "no-id.mp4", "status": "success"}\n')  # video_id なし
+        f.write('["not", "an", "object"]\n')
+        f.write("\n")
+        f.write('{"video_id": "video-3", "status": "succ')  # 書き込み途中で中断
+
+    processed = main.load_processed()
+
+    assert processed == {"video-1": {"name": "会議.mp4", "status": "success"}}
+
+
+def test_save_processed_compacts_journal_into_snapshot(processed_files):
+    processed = main.load_processed()
+    main.record_processed(processed, "video-1", {"name": "会議.mp4", "status": "success"})
+    assert main.PROCESSED_JOURNAL.exists()
+
+    main.save_processed(processed)
+
+    assert not main.PROCESSED_JOURNAL.exists()
+    assert "会議.mp4" in main.PROCESSED_LOG.read_text(encoding="utf-8")
+    assert main.load_processed() == {
+        "video-1": {"name": "会議.mp4", "status": "success"},
+    }
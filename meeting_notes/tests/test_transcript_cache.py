@@ -0,0 +1,66 @@
+import sqlite3
+
+from transcript_cache import TranscriptCache
+
+
+def test_put_then_get_returns_text(tmp_path):
+    cache = TranscriptCache(tmp_path / "cache.sqlite3", "params-a")
+    cache.put("md5-1", "- こんにちは")
+    assert cache.get("md5-1") == "- こんにちは"
+    assert cache.get("md5-2") is None
+    cache.close()
+
+
+def test_missing_md5_is_never_cached(tmp_path):
+    cache = TranscriptCache(tmp_path / "cache.sqlite3", "params-a")
+    cache.put(None, "- text")
+    cache.put("", "- text")
+    assert cache.get(None) is None
+    assert cache.get("") is None
+    cache.close()
+
+
+def test_entries_persist_across_instances(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    cache = TranscriptCache(path, "params-a")
+    cache.put("md5-1", "- first")
+    cache.put("md5-1", "- second")
+    cache.close()
+
+    cache = TranscriptCache(path, "params-a")
+    assert cache.get("md5-1") == "- second"
+    cache.close()
+
+
+def test_different_params_do_not_share_entries(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    cache = TranscriptCache(path, '{"model": "large-v3"}')
+    cache.put("md5-1", "- large-v3")
+    cache.close()
+
+    cache = TranscriptCache(path, '{"model": "large-v3-turbo"}')
+    assert cache.get("md5-1") is None
+    cache.put("md5-1", "- turbo")
+    cache.close()
+
+    cache = TranscriptCache(path, '{"model": "large-v3"}')
+    assert cache.get("md5-1") == "- large-v3"
+    cache.close()
+
+
+def test_legacy_table_without_params_is_discarded(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    conn = sqlite3.connect(str(path))
+    conn.execute(
+        "CREATE TABLE transcripts ("
+        "md5 TEXT PRIMARY KEY, text TEXT NOT NULL, created_at INTEGER NOT NULL)"
+    )
+    conn.execute("INSERT INTO transcripts VALUES ('md5-1', '- old', 0)")
+    conn.commit()
+    conn.close()
+
+    cache = TranscriptCache(path, "params-a")
+    assert cache.get("md5-1") is None
+    cache.put("md5-1", "- new")
+    assert cache.get("md5-1") == "- new"
+    cache.close()
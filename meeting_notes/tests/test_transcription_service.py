@@ -0,0 +1,78 @@
+import pytest
+
+pytest.importorskip("numpy")
+faster_whisper_utils = pytest.importorskip("faster_whisper.utils")
+huggingface_hub = pytest.importorskip("huggingface_hub")
+
+import transcription_service as ts  # noqa: E402
+
+_ALL_FILES = {"config.json", "model.bin", "tokenizer.json", "vocabulary.json"}
+
+
+def _fake_cache(monkeypatch, present, calls=None):
+    """present に含まれるファイルだけがキャッシュ済みであるように振る舞わせる。"""
+    def try_to_load_from_cache(repo_id, filename):
+        if calls is not None:
+            calls.append((repo_id, filename))
+        return f"/cache/{repo_id}/{filename}" if filename in present else None
+
+    monkeypatch.setattr(huggingface_hub, "try_to_load_from_cache", try_to_load_from_cache)
+
+
+def test_local_model_directory_counts_as_cached(tmp_path, monkeypatch):
+    calls = []
+    _fake_cache(monkeypatch, set(), calls)
+
+    assert ts._is_model_cached(str(tmp_path)) is True
+    assert calls == []
+
+
+def test_fully_cached_model(monkeypatch):
+    calls = []
+    _fake_cache(monkeypatch, _ALL_FILES, calls)
+
+    assert ts._is_model_cached("large-v3-turbo") is True
+    repo_id = faster_whisper_utils._MODELS["large-v3-turbo"]
+    assert {repo for repo, _ in calls} == {repo_id}
+
+
+def test_repo_id_is_used_as_is(monkeypatch):
+    calls = []
+    _fake_cache(monkeypatch, _ALL_FILES | {"vocabulary.txt"}, calls)
+
+    assert ts._is_model_cached("someone/faster-whisper-custom") is True
+    assert {repo for repo, _ in calls} == {"someone/faster-whisper-custom"}
+
+
+def test_uncached_model(monkeypatch):
+    _fake_cache(monkeypatch, set())
+
+    assert ts._is_model_cached("large-v3-turbo") is False
+
+
+@pytest.mark.parametrize("missing", ["config.json", "model.bin", "tokenizer.json"])
+def test_partially_downloaded_model_is_not_cached(monkeypatch, missing):
+    _fake_cache(monkeypatch, _ALL_FILES - {missing})
+
+    assert ts._is_model_cached("large-v3-turbo") is False
+
+
+def test_model_without_vocabulary_is_not_cached(monkeypatch):
+    _fake_cache(monkeypatch, _ALL_FILES - {"vocabulary.json"})
+
+    assert ts._is_model_cached("large-v3-turbo") is False
+
+
+def test_unknown_model_name_is_not_cached(monkeypatch):
+    calls = []
+    _fake_cache(monkeypatch, _ALL_FILES, calls)
+
+    assert ts._is_model_cached("no-such-model") is False
+    assert calls == []
+
+
+def test_missing_private_model_table_falls_back_to_online_load(monkeypatch):
+    _fake_cache(monkeypatch, _ALL_FILES)
+    monkeypatch.delattr(faster_whisper_utils, "_MODELS")
+
+    assert ts._is_model_cached("large-v3-turbo") is False
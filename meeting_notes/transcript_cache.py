@@ -0,0 +1,63 @@
+"""書き起こし結果のキャッシュ。
+
+Google Drive が返すファイル内容のハッシュ（md5Checksum）と書き起こし設定をキーに
+書き起こし本文を保存し、同じ内容の動画を同じ設定で再処理するとき
+（ドキュメント作成失敗後のリトライなど）にダウンロードと書き起こしを省略できるようにする。
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from pathlib import Path
+
+
+class TranscriptCache:
+    """(md5Checksum, 書き起こし設定) → 書き起こし本文 を保持する SQLite キャッシュ。"""
+
+    def __init__(self, path: Path, params: str):
+        """
+        Args:
+            path: SQLiteファイルのパス
+            params: 書き起こし結果に影響する設定を表す文字列。
+                モデルやデコード設定を変えると別のキーになり、古い結果は使われない
+        """
+        self._params = params
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        columns = {
+            row[1] for row in self._conn.execute("PRAGMA table_info(transcripts)")
+        }
+        if columns and "params" not in columns:
+            # 設定を記録していない旧形式の結果は、どの設定で作られたか分からないため破棄する
+            self._conn.execute("DROP TABLE transcripts")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS transcripts ("
+            "md5 TEXT NOT NULL, params TEXT NOT NULL, text TEXT NOT NULL, "
+            "created_at INTEGER NOT NULL, PRIMARY KEY (md5, params))"
+        )
+        self._conn.commit()
+
+    def get(self, md5: str | None) -> str | None:
+        """キャッシュ済みの書き起こし本文を返す。なければNoneを返す。"""
+        if not md5:
+            return None
+        row = self._conn.execute(
+            "SELECT text FROM transcripts WHERE md5 = ? AND params = ?",
+            (md5, self._params),
+        ).fetchone()
+        return row[0] if row else None
+
+    def put(self, md5: str | None, text: str) -> None:
+        """書き起こし本文を保存する。md5が不明な場合は何もしない。"""
+        if not md5:
+            return
+        self._conn.execute(
+            "INSERT OR REPLACE INTO transcripts (md5, params, text, created_at) "
+            "VALUES (?, ?, ?, ?)",
+            (md5, self._params, text, int(time.time())),
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
@@ -2,107 +2,415 @@
 
 from __future__ import annotations
 
+import functools
+import json
 import logging
 import os
 import sys
+import threading
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING
 
-# Windows: nvidia-cublas-cu12 等の pip パッケージに含まれる DLL を
-# ctranslate2 が見つけられるよう PATH と add_dll_directory に登録する
-if sys.platform == "win32":
-    import glob
-    import sysconfig
+import numpy as np
+
+# faster_whisper は ctranslate2・onnxruntime・PyAV まで読み込み重いため、
+# 書き起こしを行うときに初めて import する（--dry-run 等の起動を軽くする）
+if TYPE_CHECKING:
+    from faster_whisper import WhisperModel
+    from faster_whisper.vad import VadOptions
 
-    _site = sysconfig.get_path("platlib") or ""
-    _added: set[str] = set()
-    for _pattern in ("cublas*.dll", "cudnn*.dll", "cublasLt*.dll"):
-        for _dll in glob.glob(
-            os.path.join(_site, "nvidia", "**", _pattern), recursive=True
-        ):
-            _d = os.path.dirname(_dll)
-            if _d not in _added:
-                _added.add(_d)
-                os.environ["PATH"] = _d + os.pathsep + os.environ.get("PATH", "")
-                if hasattr(os, "add_dll_directory"):
-                    os.add_dll_directory(_d)
-
-from faster_whisper import WhisperModel
+# ハイパースレッディングの論理コアまで使うと行列演算のスレッドが競合するため、
+# 既定では物理コア数（論理コア数の半分）に抑える
+DEFAULT_CPU_THREADS = max(1, (os.cpu_count() or 2) // 2)
+os.environ.setdefault("OMP_NUM_THREADS", str(DEFAULT_CPU_THREADS))
 
 logger = logging.getLogger(__name__)
 
+# Whisperが入力として想定するサンプリングレート
+SAMPLE_RATE = 16000
+# Whisperが一度に処理する音声の長さ（秒）
+CHUNK_LENGTH = 30
+
+
+@functools.cache
+def _ensure_cuda_dlls() -> None:
+    """Windowsで、pipでインストールしたCUDAライブラリのDLLを読み込めるようにする。
+
+    nvidia-cublas-cu12 等の pip パッケージに含まれる DLL を
+    ctranslate2 が見つけられるよう PATH と add_dll_directory に登録する。
+    """
+    if sys.platform != "win32":
+        return
+    import fnmatch
+    import sysconfig
+
+    # DLLは nvidia/<パッケージ>/bin に置かれるため、そこだけを調べる
+    # （nvidia 配下全体を再帰的に走査すると数千ファイルを辿ることになる）
+    nvidia_dir = os.path.join(sysconfig.get_path("platlib") or "", "nvidia")
+    try:
+        packages = [e.path for e in os.scandir(nvidia_dir) if e.is_dir()]
+    except OSError:
+        return
+    for package in packages:
+        d = os.path.join(package, "bin")
+        try:
+            names = [e.name for e in os.scandir(d)]
+        except OSError:
+            continue
+        if any(fnmatch.fnmatch(name.lower(), pattern)
+               for name in names
+               for pattern in ("cublas*.dll", "cudnn*.dll")):
+            os.environ["PATH"] = d + os.pathsep + os.environ.get("PATH", "")
+            if hasattr(os, "add_dll_directory"):
+                os.add_dll_directory(d)
+
+
+# 会議音声向けのVAD設定。短い物音や息継ぎ程度の無音では区間を分けず、
+# 発話の前後は少し余白を残して語頭・語尾の欠けを防ぐ
+_VAD_PARAMETERS = {
+    "threshold": 0.5,
+    "min_speech_duration_ms": 250,
+    "max_speech_duration_s": CHUNK_LENGTH,
+    "min_silence_duration_ms": 500,
+    "speech_pad_ms": 200,
+}
+
+
+@functools.cache
+def _vad_options() -> VadOptions:
+    """_VAD_PARAMETERS からVAD設定を生成する。"""
+    from faster_whisper.vad import VadOptions
+
+    return VadOptions(**_VAD_PARAMETERS)
+
+
+def pcm16_to_float32(data: bytes) -> np.ndarray:
+    """16bitリトルエンディアンのモノラルPCMを、Whisperに渡せるfloat32波形に変換する。
+
+    16kHzのfloat32波形は1分あたり約3.8MBになるため、正規化はその場で行い
+    float32の配列を2つ同時に持たないようにする。
+    """
+    audio = np.frombuffer(data, dtype="<i2").astype(np.float32)
+    audio /= 32768.0
+    return audio
+
+
+# デバイスに合わない演算精度の置き換え先
+# （GPUのint8はfp16演算の方が速く、CPUはfp16演算に対応していない）
+_COMPUTE_TYPE_FOR_DEVICE = {
+    ("cuda", "int8"): "int8_float16",
+    ("cpu", "float16"): "int8",
+    ("cpu", "int8_float16"): "int8",
+}
+
+_model_lock = threading.Lock()
+
+
+@functools.cache
+def _detect_device() -> str:
+    _ensure_cuda_dlls()
+    import ctranslate2
+
+    return "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+
+
+def resolve_device(device: str) -> str:
+    """"auto" を実際に使うデバイス（"cuda" / "cpu"）に解決する。
+
+    CUDAの有無はプロセス内で1回だけ調べる。
+    """
+    if device != "auto":
+        return device
+    return _detect_device()
+
+
+def resolve_compute_type(device: str, compute_type: str) -> str:
+    """デバイスに合った演算精度を返す。"""
+    return _COMPUTE_TYPE_FOR_DEVICE.get((device, compute_type), compute_type)
+
+
+@functools.lru_cache(maxsize=4)
+def _cached_model(model_size: str, device: str, compute_type: str,
+                  cpu_threads: int) -> WhisperModel:
+    if device != "cpu":
+        _ensure_cuda_dlls()
+    from faster_whisper import WhisperModel
+
+    load = functools.partial(
+        WhisperModel,
+        model_size,
+        device=device,
+        compute_type=compute_type,
+        cpu_threads=cpu_threads,
+    )
+    # ダウンロード済みならHugging Face Hubへの問い合わせを省き、ローカルのキャッシュから読み込む
+    if _is_model_cached(model_size):
+        try:
+            return load(local_files_only=True)
+        except (OSError, RuntimeError, ValueError) as e:
+            # キャッシュが壊れている場合は、Hubから取り直して修復する
+            logger.warning(
+                "ローカルのモデル %s を読み込めなかったため、再ダウンロードします: %s",
+                model_size, e,
+            )
+    else:
+        logger.info(
+            "モデル %s はまだダウンロードされていないため、初回のみダウンロードします"
+            "（数GBあり時間がかかります）",
+            model_size,
+        )
+    return load(local_files_only=False)
+
+
+# WhisperModel の読み込みに必要なファイル（語彙ファイルはモデルによって形式が異なる）
+_MODEL_FILES = ("config.json", "model.bin", "tokenizer.json")
+_VOCABULARY_FILES = ("vocabulary.json", "vocabulary.txt")
+
+
+def _is_model_cached(model_size: str) -> bool:
+    """モデルの必要なファイルがすべてローカルにあるかを、Hubへ問い合わせずに調べる。"""
+    if os.path.isdir(model_size):
+        return True
+    try:
+        # モデル名 → HubのリポジトリIDの対応表（非公開のため、なくなった場合は通常の読み込みにする）
+        from faster_whisper.utils import _MODELS
+
+        repo_id = model_size if "/" in model_size else _MODELS.get(model_size)
+    except (ImportError, AttributeError):
+        return False
+    if repo_id is None:
+        return False
+    from huggingface_hub import try_to_load_from_cache
+
+    def cached(filename: str) -> bool:
+        return isinstance(try_to_load_from_cache(repo_id, filename), str)
+
+    return all(cached(f) for f in _MODEL_FILES) and any(
+        cached(f) for f in _VOCABULARY_FILES
+    )
+
+
+def get_model(model_size: str, device: str, compute_type: str,
+              cpu_threads: int = 0) -> WhisperModel:
+    """WhisperModelをロードする。同じ設定のモデルはプロセス内で使い回す。
+
+    device と compute_type は解決後の値でキャッシュするため、"auto" と明示指定で
+    同じモデルを二重にロードすることはない。cpu_threads が0の場合は
+    DEFAULT_CPU_THREADS を使う。
+    """
+    device = resolve_device(device)
+    compute_type = resolve_compute_type(device, compute_type)
+    cpu_threads = cpu_threads or DEFAULT_CPU_THREADS
+    # lru_cache は同時に呼ばれると二重にロードしうるため、初回ロードを直列化する
+    with _model_lock:
+        return _cached_model(model_size, device, compute_type, cpu_threads)
+
+
+def detect_speech(audio: np.ndarray) -> list[dict]:
+    """Silero VADで発話区間を検出し、バッチ推論用の区間リストを返す。
+
+    CPUのみで動くため、書き起こし中の別スレッドで先に計算しておける。
+
+    Returns:
+        {"start": 開始サンプル, "end": 終了サンプル} のリスト
+    """
+    from faster_whisper.vad import get_speech_timestamps, merge_segments
+
+    vad_options = _vad_options()
+    return merge_segments(get_speech_timestamps(audio, vad_options), vad_options)
+
 
 class JapaneseTranscriber:
     """faster-whisper ベースの日本語書き起こしクラス。"""
 
-    FIXED_MODEL_SIZE = "large-v3"
+    # large-v3 とほぼ同等の精度で、デコーダ層が32→4層に減り大幅に速い
+    DEFAULT_MODEL_SIZE = "large-v3-turbo"
+
+    # 各区間のデコード時に与える文脈。会議の話し言葉・句読点付きの表記に寄せる
+    DEFAULT_INITIAL_PROMPT = "これは日本語の会議の音声です。"
+
+    # 呼び出しごとに変わらないデコード設定
+    DECODE_OPTIONS = {
+        "language": "ja",
+        "task": "transcribe",
+        "temperature": 0.0,
+        "best_of": 1,
+        # 単語単位のタイムスタンプは使わないため、アライメント計算を明示的に無効化する
+        "word_timestamps": False,
+        # 無音判定・低信頼度判定のしきい値（faster-whisperの既定値を明示）
+        "no_speech_threshold": 0.6,
+        "log_prob_threshold": -1.0,
+    }
 
     def __init__(
         self,
         compute_type: str = "int8",
         device: str = "cpu",
+        batch_size: int = 8,
+        beam_size: int = 1,
+        model_size: str = DEFAULT_MODEL_SIZE,
+        cpu_threads: int = 0,
+        initial_prompt: str | None = DEFAULT_INITIAL_PROMPT,
     ):
+        """
+        Args:
+            compute_type: CTranslate2 の演算精度（デバイスに合わない場合は置き換える）
+            device: 推論デバイス（"cpu" / "cuda" / "auto"）
+            batch_size: VADで区切った音声区間をまとめて推論する件数（1で逐次推論）
+            beam_size: ビームサーチのサイズ（1で貪欲デコード）
+            model_size: Whisperのモデル名（"large-v3" など）
+            cpu_threads: CPU推論のスレッド数（0で物理コア数）
+            initial_prompt: デコード時に与えるプロンプト（社内用語などを含めると認識が安定する）
+        """
+        device = resolve_device(device)
+        compute_type = resolve_compute_type(device, compute_type)
         logger.info(
-            "Whisperモデルをロード中: model=%s, device=%s, compute_type=%s",
-            self.FIXED_MODEL_SIZE,
+            "Whisperモデルをロード中: model=%s, device=%s, compute_type=%s, "
+            "batch_size=%d, beam_size=%d",
+            model_size,
             device,
             compute_type,
+            batch_size,
+            beam_size,
         )
-        self.model = WhisperModel(
-            self.FIXED_MODEL_SIZE,
-            device=device,
-            compute_type=compute_type,
+        self.model = get_model(model_size, device, compute_type, cpu_threads)
+        self.model_size = model_size
+        self.batch_size = batch_size
+        self.beam_size = beam_size
+        self.initial_prompt = initial_prompt or None
+        # 書き起こし結果に影響する設定（transcribe() を既定の引数で呼んだ場合）。
+        # 書き起こし結果をキャッシュするときのキーに使う
+        self.cache_params = json.dumps(
+            {
+                "model": model_size,
+                "compute_type": compute_type,
+                "batched": batch_size > 1,
+                "beam_size": beam_size,
+                "initial_prompt": self.initial_prompt,
+                "condition_on_previous_text": False,
+                "decode": self.DECODE_OPTIONS,
+                "vad": _VAD_PARAMETERS,
+            },
+            ensure_ascii=False,
+            sort_keys=True,
         )
+        from faster_whisper import BatchedInferencePipeline
+
+        self.pipeline = BatchedInferencePipeline(model=self.model)
         logger.info("Whisperモデルのロード完了")
+        if device == "cuda":
+            self._warm_up()
+
+    def _warm_up(self) -> None:
+        """無音で一度推論し、GPUのカーネル初期化やメモリ確保を先に済ませる。"""
+        silence = np.zeros(SAMPLE_RATE * 5, dtype=np.float32)
+        segments, _ = self.model.transcribe(
+            silence, language="ja", beam_size=1, vad_filter=False,
+        )
+        # segments は遅延評価のため、最後まで読み出して推論を実行させる
+        for _ in segments:
+            pass
+        logger.info("Whisperモデルのウォームアップ完了")
 
     def transcribe(
         self,
-        media_path: str,
+        audio: str | np.ndarray,
         vad_filter: bool = True,
-        beam_size: int = 5,
-    ) -> list:
-        """音声/動画ファイルを日本語で書き起こす。
+        beam_size: int | None = None,
+        clip_timestamps: list[dict] | None = None,
+        condition_on_previous_text: bool = False,
+        initial_prompt: str | None = None,
+    ) -> Iterator:
+        """音声を日本語で書き起こす。
 
         Args:
-            media_path: 音声または動画ファイルのパス
+            audio: 音声または動画ファイルのパス、もしくは16kHzモノラルのfloat32波形
             vad_filter: VADフィルタの有効化（無音区間スキップ）
-            beam_size: ビームサーチのサイズ
+            beam_size: ビームサーチのサイズ（省略時はコンストラクタで指定した値）
+            clip_timestamps: detect_speech() で検出済みの発話区間。指定するとVADを省略する
+            condition_on_previous_text: 直前の書き起こし結果をプロンプトとして渡すか。
+                有効にすると区間ごとのデコード量が増え、同じ文の繰り返しも起きやすい
+            initial_prompt: デコード時に与えるプロンプト（省略時はコンストラクタで指定した値）
 
         Returns:
-            書き起こしセグメントのリスト
+            書き起こしセグメントのイテレータ。デコードは読み出しに合わせて進む
         """
-        logger.info("書き起こし開始: %s", media_path)
-        segments, info = self.model.transcribe(
-            media_path,
-            language="ja",
-            task="transcribe",
-            vad_filter=vad_filter,
-            beam_size=beam_size,
-            condition_on_previous_text=True,
-            temperature=0.0,
-        )
+        if isinstance(audio, np.ndarray):
+            logger.info("書き起こし開始: %.0f秒の音声", len(audio) / SAMPLE_RATE)
+        else:
+            logger.info("書き起こし開始: %s", audio)
+        if beam_size is None:
+            beam_size = self.beam_size
+        if initial_prompt is None:
+            initial_prompt = self.initial_prompt
+        if clip_timestamps is not None and not clip_timestamps:
+            logger.info("発話区間が検出されなかったため書き起こしを省略します")
+            return iter(())
+        if self.batch_size > 1:
+            # VADで区切った音声区間をバッチにまとめてエンコーダ/デコーダに流す
+            segments, info = self.pipeline.transcribe(
+                audio,
+                vad_filter=vad_filter,
+                vad_parameters=_vad_options(),
+                beam_size=beam_size,
+                batch_size=self.batch_size,
+                clip_timestamps=clip_timestamps,
+                condition_on_previous_text=condition_on_previous_text,
+                initial_prompt=initial_prompt,
+                **self.DECODE_OPTIONS,
+            )
+        else:
+            # 逐次推論では区間を [開始秒, 終了秒, ...] の形式で渡す
+            segments, info = self.model.transcribe(
+                audio,
+                vad_filter=vad_filter,
+                vad_parameters=_vad_options(),
+                beam_size=beam_size,
+                clip_timestamps=(
+                    [t / SAMPLE_RATE for c in clip_timestamps for t in (c["start"], c["end"])]
+                    if clip_timestamps else "0"
+                ),
+                condition_on_previous_text=condition_on_previous_text,
+                initial_prompt=initial_prompt,
+                **self.DECODE_OPTIONS,
+            )
         logger.info(
             "言語検出: %s (確率: %.2f)",
             info.language,
             info.language_probability,
         )
-        segment_list = list(segments)
-        logger.info("書き起こし完了: %d セグメント", len(segment_list))
-        return segment_list
+        return _count_segments(segments)
+
 
+def _count_segments(segments: Iterable) -> Iterator:
+    """セグメントをそのまま流し、読み終えたら件数をログに出す。"""
+    count = 0
+    for seg in segments:
+        count += 1
+        yield seg
+    logger.info("書き起こし完了: %d セグメント", count)
 
-def render_meeting_notes(video_name: str, segments) -> str:
-    """書き起こし結果を議事録向けテキストに整形する。"""
-    lines = [
-        f"# 議事録（自動書き起こし）: {video_name}",
-        "",
-        "## 書き起こし全文（日本語）",
-    ]
 
-    if not segments:
-        lines.append("- （音声が検出できませんでした）")
-        return "\n".join(lines)
+def render_transcript(segments: Iterable) -> str:
+    """書き起こしセグメントを箇条書きの本文に整形する。
+
+    セグメントは受け取った順に整形するため、デコード中のイテレータをそのまま渡せる。
+    """
+    texts = [(seg.text or "").strip() or "（聞き取り不明）" for seg in segments]
+    if not texts:
+        return "- （音声が検出できませんでした）"
+    # 行頭の "- " は区切り文字に含め、1回の join でまとめて付ける
+    return "- " + "\n- ".join(texts)
+
+
+_NOTES_TEMPLATE = (
+    "# 議事録（自動書き起こし）: {video_name}\n"
+    "\n"
+    "## 書き起こし全文（日本語）\n"
+    "{transcript}"
+)
 
-    for seg in segments:
-        text = seg.text.strip() if seg.text else "（聞き取り不明）"
-        lines.append(f"- {text}")
 
-    return "\n".join(lines)
+def render_meeting_notes(video_name: str, transcript: str) -> str:
+    """書き起こし本文に見出しを付け、議事録向けテキストに整形する。"""
+    return _NOTES_TEMPLATE.format(video_name=video_name, transcript=transcript)